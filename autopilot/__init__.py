@@ -1,8 +1,25 @@
-from .callback import CallbackClient
-from .config import JobConfig
-from .job import Job, TaskInput
-from .job_service import JobService, get_job_service
-from .task import TaskResult, TaskRunner, TaskStatus
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .callback import CallbackClient
+    from .config import JobConfig
+    from .job import Job, TaskInput
+    from .job_service import JobService, get_job_service
+    from .task import TaskResult, TaskRunner, TaskStatus
+
+# 导出名 -> 所在子模块；首次访问时才导入（避免 `ele-autopilot --help` 等入口加载 browser-use）
+_EXPORTS = {
+    "CallbackClient": ".callback",
+    "Job": ".job",
+    "JobConfig": ".config",
+    "JobService": ".job_service",
+    "TaskInput": ".job",
+    "TaskResult": ".task",
+    "TaskRunner": ".task",
+    "TaskStatus": ".task",
+    "get_job_service": ".job_service",
+}
 
 __all__ = [
     "CallbackClient",
@@ -15,3 +32,12 @@ __all__ = [
     "TaskStatus",
     "get_job_service",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
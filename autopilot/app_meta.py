@@ -1,5 +1,6 @@
 """项目元信息获取模块。"""
 
+from functools import cache
 from importlib.metadata import version, PackageNotFoundError
 
 _PACKAGE_NAME = "ele-autopilot-local"
@@ -10,8 +11,9 @@ def project_name() -> str:
     return _PACKAGE_NAME
 
 
+@cache
 def project_version() -> str:
-    """获取项目版本号。"""
+    """获取项目版本号（进程内不变，首次查询后缓存，避免重复扫描包元数据）。"""
     try:
         return version(_PACKAGE_NAME)
     except PackageNotFoundError:
@@ -0,0 +1,191 @@
+"""
+浏览器池：跨 Job 复用已启动的 keep_alive 浏览器
+
+职责：
+- 按需创建浏览器（总数不超过 max_size），用完归还而不是关闭，省去 Chrome 冷启动
+- 归还时重置状态（关闭多余标签页并回到 about:blank），借出前确认浏览器进程仍存活
+- 进程退出前统一关闭池内浏览器
+"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Awaitable, Callable, Hashable
+
+import psutil
+
+if TYPE_CHECKING:
+    from browser_use import Browser
+
+logger = logging.getLogger(__name__)
+
+_KILL_TIMEOUT_SECONDS = 3.0
+# 重置同样是无超时的 CDP 调用，Chrome 卡死时不能无限等待
+_RESET_TIMEOUT_SECONDS = _KILL_TIMEOUT_SECONDS
+
+# 视为浏览器进程已退出的 psutil 状态
+DEAD_PROCESS_STATUSES = frozenset({psutil.STATUS_ZOMBIE, psutil.STATUS_DEAD})
+
+
+def _get_browser_process(browser: "Browser") -> psutil.Process | None:
+    """获取 watchdog 持有的本地浏览器进程句柄（浏览器已停止时为 None）"""
+    try:
+        return browser._local_browser_watchdog._subprocess
+    except Exception:
+        return None
+
+
+def _is_browser_alive(browser: "Browser") -> bool:
+    """浏览器进程是否仍在运行（空闲期间可能崩溃或被用户关闭）"""
+    proc = _get_browser_process(browser)
+    if proc is None:
+        return False
+    try:
+        return proc.is_running() and proc.status() not in DEAD_PROCESS_STATUSES
+    except psutil.Error:
+        return False
+
+
+async def _kill_browser(browser: "Browser") -> None:
+    """
+    结束浏览器进程（keep_alive 浏览器调用 stop 只会断开连接，必须 kill）
+
+    Chrome 卡死（CDP 无响应等）时 kill 可能一直不返回，超时后直接强杀进程，
+    避免阻塞后续 Job。
+    """
+    # 先取出进程句柄：kill 过程中 watchdog 会清空它
+    proc = _get_browser_process(browser)
+
+    try:
+        await asyncio.wait_for(browser.kill(), timeout=_KILL_TIMEOUT_SECONDS)
+        return
+    except asyncio.TimeoutError:
+        logger.warning(
+            "Browser kill timed out after %.1fs, force killing process %s",
+            _KILL_TIMEOUT_SECONDS,
+            proc.pid if proc is not None else None,
+        )
+    except Exception:
+        pass
+
+    # watchdog 持有的是 psutil.Process：kill() 在 POSIX 下发 SIGKILL，Windows 下 TerminateProcess
+    if proc is not None:
+        try:
+            proc.kill()
+        except Exception:
+            pass
+
+
+async def _reset_browser(browser: "Browser") -> None:
+    """关闭除当前 focus 外的标签页，并把保留的标签页导航到 about:blank"""
+    targets = browser.get_page_targets()
+    if not targets:
+        raise RuntimeError("browser has no open tabs")
+
+    keep_id = browser.agent_focus_target_id or targets[0].target_id
+    for target in targets:
+        if target.target_id != keep_id:
+            await browser.close_page(target.target_id)
+    await browser.navigate_to("about:blank")
+
+
+async def reset_browser(browser: "Browser") -> bool:
+    """
+    重置浏览器状态（限时执行）
+
+    Returns:
+        重置成功返回 True；超时或出错返回 False（浏览器不宜再复用）
+    """
+    try:
+        await asyncio.wait_for(_reset_browser(browser), timeout=_RESET_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Browser reset timed out after %.1fs", _RESET_TIMEOUT_SECONDS)
+        return False
+    except Exception as e:
+        logger.warning("Failed to reset browser: %s", e)
+        return False
+    return True
+
+
+class BrowserPool:
+    """
+    keep_alive 浏览器池
+
+    说明：
+    - 空闲浏览器连同创建时的 key 一起入队；key 不一致（如 headless 不同）时关闭重建
+    - 同时借出的浏览器不超过 max_size；默认 1，因为所有浏览器共用同一个持久化 profile 目录
+    """
+
+    def __init__(self, max_size: int = 1):
+        self.max_size = max_size
+        self._idle: asyncio.Queue[tuple[Hashable, "Browser"]] = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max_size)
+
+    async def _take(
+        self, key: Hashable, factory: Callable[[], Awaitable["Browser"]]
+    ) -> "Browser":
+        """取出 key 匹配且仍存活的空闲浏览器，没有则新建（调用方需已占用一个名额）"""
+        while not self._idle.empty():
+            idle_key, browser = self._idle.get_nowait()
+            if idle_key == key:
+                if _is_browser_alive(browser):
+                    return browser
+                logger.warning("Pooled browser is no longer running, discarding it")
+            await _kill_browser(browser)
+        return await factory()
+
+    async def acquire(
+        self, key: Hashable, factory: Callable[[], Awaitable["Browser"]]
+    ) -> "Browser":
+        """借出一个浏览器（池满时等待其他调用方归还）；用完必须调用 release"""
+        await self._slots.acquire()
+        try:
+            return await self._take(key, factory)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(
+        self, key: Hashable, browser: "Browser", discard: bool = False
+    ) -> None:
+        """
+        归还浏览器
+
+        Args:
+            key: 借出时使用的 key
+            browser: 借出的浏览器
+            discard: 为 True 时直接关闭（如浏览器已被用户关闭），不再放回池中
+        """
+        try:
+            if not discard and not await reset_browser(browser):
+                # 重置失败（含 Chrome 卡死超时）：关闭而不是放回池中
+                discard = True
+            if discard:
+                await _kill_browser(browser)
+            else:
+                self._idle.put_nowait((key, browser))
+        finally:
+            self._slots.release()
+
+    async def close(self) -> None:
+        """关闭所有空闲浏览器（借出中的浏览器由归还方负责）"""
+        while not self._idle.empty():
+            _, browser = self._idle.get_nowait()
+            await _kill_browser(browser)
+
+
+# 模块级单例：在进程内跨 Job 复用同一个浏览器池
+_browser_pool_singleton: BrowserPool | None = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """获取 BrowserPool 单例"""
+    global _browser_pool_singleton
+    if _browser_pool_singleton is None:
+        _browser_pool_singleton = BrowserPool()
+    return _browser_pool_singleton
+
+
+async def close_browser_pool() -> None:
+    """关闭浏览器池中的浏览器（进程退出前调用）"""
+    if _browser_pool_singleton is not None:
+        await _browser_pool_singleton.close()
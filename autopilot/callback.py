@@ -4,30 +4,244 @@
 职责：
 - 上报单个 task 状态（包含完整执行结果）
 - 上报 Job 完成状态
+- task 状态通过后台队列异步上报，不阻塞 task 执行
 """
 
+import asyncio
 import logging
 from datetime import datetime
-from typing import Any
+from typing import Any, AsyncIterator, Iterator, TypedDict
 
 import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
 
+class TaskUpdate(TypedDict):
+    """task 状态回调的 payload 结构（POST {callback_url}/task，批量模式为其数组）"""
+
+    task_index: int
+    task_id: str
+    status: str
+    result: dict[str, Any] | None
+    error: str | None
+    started_at: datetime | None
+    completed_at: datetime | None
+
+
+# 进程级共享 HTTP 客户端：跨 Job 复用连接池，避免每个 Job 重新建立 TCP/TLS 连接
+_shared_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """获取（必要时创建）共享 HTTP 客户端"""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
+        )
+    return _shared_client
+
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+# 逐元素展开的最大嵌套层级，更深的值整体编码；
+# 需覆盖到 raw_history.history 的每个 step（批量模式下位于第 5 层）
+_STREAM_MAX_DEPTH = 5
+_STREAM_CHUNK_SIZE = 64 * 1024  # 攒够该大小再发送一个 chunk，避免碎片化的小帧
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson 无法原生编码的值：集合转列表，其余退化为字符串（同 _safe_dump 的兜底）"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    try:
+        return str(obj)
+    except Exception:
+        return repr(obj)
+
+
+def _iter_json_pieces(value: Any, depth: int = 0) -> Iterator[bytes]:
+    """按 dict/list 元素逐段编码 JSON（产出的片段可能很小，由调用方合并）"""
+    if depth < _STREAM_MAX_DEPTH and isinstance(value, dict):
+        yield b"{"
+        for i, (key, item) in enumerate(value.items()):
+            yield b'"' if i == 0 else b',"'
+            yield orjson.dumps(str(key))[1:-1]
+            yield b'":'
+            yield from _iter_json_pieces(item, depth + 1)
+        yield b"}"
+    elif depth < _STREAM_MAX_DEPTH and isinstance(value, list):
+        yield b"["
+        for i, item in enumerate(value):
+            if i:
+                yield b","
+            yield from _iter_json_pieces(item, depth + 1)
+        yield b"]"
+    else:
+        yield orjson.dumps(value, default=_json_default, option=_ORJSON_OPTIONS)
+
+
+def _encode_json_body(value: Any) -> bytes | AsyncIterator[bytes]:
+    """
+    编码请求体：不足一个 chunk 的 payload（常见情况）直接返回 bytes，
+    httpx 据此发送 Content-Length；超过时改为 chunked 方式边编码边发送
+
+    task result 可能达数 MB，流式发送可避免 payload 与完整 bytes 同时驻留内存。
+    """
+    pieces = _iter_json_pieces(value)
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += piece
+        if len(buffer) >= _STREAM_CHUNK_SIZE:
+            return _iter_json_chunks(bytes(buffer), pieces)
+    return bytes(buffer)
+
+
+async def _iter_json_chunks(
+    head: bytes, pieces: Iterator[bytes]
+) -> AsyncIterator[bytes]:
+    """先发送已编码的 head，再把剩余片段合并为约 64 KiB 的 chunk 逐个产出"""
+    yield head
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += piece
+        if len(buffer) >= _STREAM_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def close_shared_client() -> None:
+    """关闭共享 HTTP 客户端（进程退出前调用）"""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
+
 class CallbackClient:
     """回调客户端（Local 主动回调 Server）"""
 
-    def __init__(self, callback_url: str | None):
+    _BATCH_WINDOW_SECONDS = 0.05  # 批量模式下等待更多更新的合并窗口
+    _BATCH_MAX_SIZE = 16  # 批量模式下单次 POST 的最大更新数
+
+    def __init__(self, callback_url: str | None, batch: bool = False):
         """
         初始化回调客户端
 
         Args:
             callback_url: Server 的回调基础 URL，格式：http://server-host:port/api/jobs/{job_id}/callback
                          如果为 None，则不执行回调（Local 独立运行模式）
+            batch: 是否把排队的 task 更新合并后 POST 到 {callback_url}/task/batch（需 Server 支持）；
+                   为 False 时逐条 POST 到 {callback_url}/task
         """
         self.callback_url = callback_url
-        self.client = httpx.AsyncClient(timeout=30.0) if callback_url else None
+        self.batch = batch
+        self._queue: asyncio.Queue[TaskUpdate] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """启动后台上报协程（无回调 URL 时不启动）"""
+        if self.callback_url and self._worker is None:
+            self._worker = asyncio.create_task(self._drain())
+
+    @staticmethod
+    def _build_task_payload(
+        task_index: int,
+        task_id: str,
+        status: str,
+        result: dict[str, Any] | None,
+        error: str | None,
+        started_at: datetime | None,
+        completed_at: datetime | None,
+    ) -> TaskUpdate:
+        return TaskUpdate(
+            task_index=task_index,
+            task_id=task_id,
+            status=status,
+            result=result,
+            error=error,
+            started_at=started_at,
+            completed_at=completed_at,
+        )
+
+    def enqueue_task_update(
+        self,
+        task_index: int,
+        task_id: str,
+        status: str,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+        started_at: datetime | None = None,
+        completed_at: datetime | None = None,
+    ) -> None:
+        """
+        将 task 状态放入上报队列后立即返回，由后台协程按入队顺序上报
+
+        参数同 report_task_update；需先调用 start()，Job 结束前调用 flush() 等待上报完成。
+        """
+        if not self.callback_url:
+            return  # 无回调 URL，不上报
+
+        self._queue.put_nowait(
+            self._build_task_payload(
+                task_index, task_id, status, result, error, started_at, completed_at
+            )
+        )
+
+    async def flush(self) -> None:
+        """等待队列中所有 task 更新上报完成"""
+        if self._worker is not None:
+            await self._queue.join()
+
+    async def _drain(self) -> None:
+        """后台上报协程：批量模式下合并窗口内的更新，否则逐条按序上报"""
+        while True:
+            payloads = [await self._queue.get()]
+            try:
+                if self.batch:
+                    # 等待一个合并窗口，把期间入队的更新一起发送
+                    await asyncio.sleep(self._BATCH_WINDOW_SECONDS)
+                    while (
+                        len(payloads) < self._BATCH_MAX_SIZE and not self._queue.empty()
+                    ):
+                        payloads.append(self._queue.get_nowait())
+                    await self._post("/task/batch", payloads, "Task batch callback")
+                else:
+                    await self._post("/task", payloads[0], "Task callback")
+            finally:
+                for _ in payloads:
+                    self._queue.task_done()
+
+    async def _post(self, path: str, payload: Any, label: str) -> bool:
+        """POST 到 {callback_url}{path}，失败仅记录日志
+
+        payload 用 orjson 分段序列化（datetime 直接输出 ISO 8601），
+        超过 64 KiB 时以 chunked 方式流式发送。
+        """
+        try:
+            url = f"{self.callback_url}{path}"
+            response = await _get_client().post(
+                url,
+                content=_encode_json_body(payload),
+                headers={"Content-Type": "application/json"},
+            )
+            if response.status_code != 200:
+                logger.warning(
+                    "%s returned non-200 status: %d, body: %s",
+                    label,
+                    response.status_code,
+                    response.text[:500],
+                )
+                return False
+            return True
+        except Exception as e:
+            # 回调失败不影响任务执行，仅记录日志
+            logger.warning("%s failed: %s", label, e)
+            return False
 
     async def report_task_update(
         self,
@@ -40,7 +254,7 @@ class CallbackClient:
         completed_at: datetime | None = None,
     ) -> bool:
         """
-        上报单个 task 状态到 Server
+        上报单个 task 状态到 Server（同步等待单次 POST）
 
         重要：result 包含完整的执行结果（参考 task_action_out.template.json），
         数据量可能很大，但需要全量上传，后续在 UI 中展示。
@@ -57,34 +271,13 @@ class CallbackClient:
         Returns:
             回调是否成功
         """
-        if not self.client:
+        if not self.callback_url:
             return True  # 无回调 URL，视为成功
 
-        payload = {
-            "task_index": task_index,
-            "task_id": task_id,
-            "status": status,
-            "result": result,
-            "error": error,
-            "started_at": started_at.isoformat() if started_at else None,
-            "completed_at": completed_at.isoformat() if completed_at else None,
-        }
-
-        try:
-            url = f"{self.callback_url}/task"
-            response = await self.client.post(url, json=payload)
-            if response.status_code != 200:
-                logger.warning(
-                    "Task callback returned non-200 status: %d, body: %s",
-                    response.status_code,
-                    response.text[:500],
-                )
-                return False
-            return True
-        except Exception as e:
-            # 回调失败不影响任务执行，仅记录日志
-            logger.warning("Task callback failed: %s", e)
-            return False
+        payload = self._build_task_payload(
+            task_index, task_id, status, result, error, started_at, completed_at
+        )
+        return await self._post("/task", payload, "Task callback")
 
     async def report_job_complete(
         self,
@@ -103,32 +296,24 @@ class CallbackClient:
         Returns:
             回调是否成功
         """
-        if not self.client:
+        if not self.callback_url:
             return True  # 无回调 URL，视为成功
 
         payload = {
             "status": status,
             "error": error,
-            "completed_at": completed_at.isoformat() if completed_at else None,
+            "completed_at": completed_at,
         }
-
-        try:
-            url = f"{self.callback_url}/complete"
-            response = await self.client.post(url, json=payload)
-            if response.status_code != 200:
-                logger.warning(
-                    "Job complete callback returned non-200 status: %d, body: %s",
-                    response.status_code,
-                    response.text[:500],
-                )
-                return False
-            return True
-        except Exception as e:
-            logger.warning("Job complete callback failed: %s", e)
-            return False
+        return await self._post("/complete", payload, "Job complete callback")
 
     async def close(self) -> None:
-        """关闭 HTTP 客户端"""
-        if self.client:
-            await self.client.aclose()
-            self.client = None
+        """停止后台上报协程（HTTP 客户端为进程共享，由 close_shared_client 统一关闭）"""
+        worker = self._worker
+        if worker is None:
+            return
+        self._worker = None
+        worker.cancel()
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
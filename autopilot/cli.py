@@ -1,91 +1,179 @@
 """CLI 入口点和 FastAPI 应用定义。
 
 此模块用于 `uv tool install` 或 `uvx` 安装后的命令行入口。
+FastAPI / uvicorn 等重依赖只在 `serve` 时导入，`--help` 等路径保持轻量。
 """
 
-import argparse
-
-from fastapi import FastAPI, HTTPException
-from fastapi.exceptions import RequestValidationError
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import ValidationError
-import uvicorn
-
-# import patches
-# patches.apply_all()  # 第三方库 monkey-patch，必须在业务模块之前加载
+import sys
+from contextlib import asynccontextmanager
+from typing import NoReturn
 
 from autopilot.app_meta import project_name, project_version
-from routers import system, autopilot
-from middleware import (
-    ResponseWrapperMiddleware,
-    http_exception_handler,
-    validation_exception_handler,
-    pydantic_exception_handler,
-    generic_exception_handler,
-)
-
-
-app = FastAPI(
-    title=project_name(),
-    description="Local autopilot service",
-    version=project_version(),
-)
-
-# 注册 CORS 中间件（允许前端跨域访问）
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # 允许所有来源（本地开发环境）
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# 注册响应包装中间件
-app.add_middleware(ResponseWrapperMiddleware)
-
-# 注册异常处理器
-app.add_exception_handler(HTTPException, http_exception_handler)
-app.add_exception_handler(RequestValidationError, validation_exception_handler)
-app.add_exception_handler(ValidationError, pydantic_exception_handler)
-app.add_exception_handler(Exception, generic_exception_handler)
-
-# 注册路由
-app.include_router(system.router)
-app.include_router(autopilot.router)
-
-
-@app.get("/")
-async def root():
-    return {"message": "Hello from ele-autopilot-local!"}
 
 
-def cli():
-    """命令行入口 - 供 uv tool install 后使用"""
-    parser = argparse.ArgumentParser(
-        description="Ele Autopilot Local - Browser automation service"
+def create_app():
+    """构建 FastAPI 应用（供 uvicorn factory 模式调用）"""
+    from fastapi import FastAPI, HTTPException
+    from fastapi.exceptions import RequestValidationError
+    from fastapi.middleware.cors import CORSMiddleware
+    from pydantic import ValidationError
+
+    # import patches
+    # patches.apply_all()  # 第三方库 monkey-patch，必须在业务模块之前加载
+
+    from autopilot.browser_pool import close_browser_pool
+    from autopilot.callback import close_shared_client
+    from routers import system, autopilot
+    from middleware import (
+        ResponseWrapperMiddleware,
+        http_exception_handler,
+        validation_exception_handler,
+        pydantic_exception_handler,
+        generic_exception_handler,
     )
-    subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
-    # serve 命令
-    serve_parser = subparsers.add_parser("serve", help="Start the HTTP server")
-    serve_parser.add_argument(
-        "--port", "-p", type=int, default=8000, help="Port to listen on (default: 8000)"
-    )
-    serve_parser.add_argument(
-        "--host", "-H", default="0.0.0.0", help="Host to bind (default: 0.0.0.0)"
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI):
+        yield
+        # 关闭回调共享的 HTTP 连接池与浏览器池中的空闲浏览器
+        await close_shared_client()
+        await close_browser_pool()
+
+    app = FastAPI(
+        title=project_name(),
+        description="Local autopilot service",
+        version=project_version(),
+        lifespan=lifespan,
     )
-    serve_parser.add_argument(
-        "--reload", "-r", action="store_true", help="Enable auto-reload for development"
+
+    # 注册 CORS 中间件（允许前端跨域访问）
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # 允许所有来源（本地开发环境）
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["Link"],  # 分页的下一页链接需对浏览器端脚本可见
     )
 
-    args = parser.parse_args()
+    # 注册响应包装中间件
+    app.add_middleware(ResponseWrapperMiddleware)
+
+    # 注册异常处理器
+    app.add_exception_handler(HTTPException, http_exception_handler)
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(ValidationError, pydantic_exception_handler)
+    app.add_exception_handler(Exception, generic_exception_handler)
+
+    # 注册路由
+    app.include_router(system.router)
+    app.include_router(autopilot.router)
+
+    @app.get("/")
+    async def root():
+        return {"message": "Hello from ele-autopilot-local!"}
+
+    return app
+
+
+_MAIN_HELP = """\
+usage: ele-autopilot [-h] {serve} ...
+
+Ele Autopilot Local - Browser automation service
+
+positional arguments:
+  {serve}     Available commands
+    serve     Start the HTTP server
 
-    if args.command == "serve":
-        uvicorn.run(
-            "autopilot.cli:app", host=args.host, port=args.port, reload=args.reload
+options:
+  -h, --help  show this help message and exit
+"""
+
+_SERVE_HELP = """\
+usage: ele-autopilot serve [-h] [--port PORT] [--host HOST] [--reload]
+
+options:
+  -h, --help            show this help message and exit
+  --port PORT, -p PORT  Port to listen on (default: 8000)
+  --host HOST, -H HOST  Host to bind (default: 0.0.0.0)
+  --reload, -r          Enable auto-reload for development
+"""
+
+
+def _usage_error(usage: str, message: str) -> NoReturn:
+    """输出用法与错误信息并以状态码 2 退出（与 argparse 行为一致）"""
+    sys.stderr.write(usage.split("\n", 1)[0] + "\n")
+    sys.stderr.write(f"ele-autopilot: error: {message}\n")
+    sys.exit(2)
+
+
+def _parse_serve_args(argv: list[str]) -> dict:
+    """解析 serve 子命令参数（仅 --port/--host/--reload 三个选项）"""
+    options = {"host": "0.0.0.0", "port": 8000, "reload": False}
+    args = list(argv)
+    while args:
+        arg = args.pop(0)
+        if arg.startswith("-") and not arg.startswith("--") and len(arg) > 2:
+            # 与 argparse 一致的短选项写法：-p9000、-p=9000、-Hlocalhost、-rp9000
+            name, rest = arg[:2], arg[2:]
+            if name in ("-p", "-H"):
+                arg = f"{name}={rest.removeprefix('=')}"
+            elif name in ("-r", "-h"):
+                args.insert(0, "-" + rest)
+                arg = name
+        name, has_value, value = arg.partition("=")
+        if name in ("-h", "--help"):
+            sys.stdout.write(_SERVE_HELP)
+            sys.exit(0)
+        if name in ("-r", "--reload") and not has_value:
+            options["reload"] = True
+            continue
+        if name not in ("-p", "--port", "-H", "--host"):
+            _usage_error(_SERVE_HELP, f"unrecognized arguments: {arg}")
+        if not has_value:
+            if not args:
+                _usage_error(_SERVE_HELP, f"argument {name}: expected one argument")
+            value = args.pop(0)
+        if name in ("-p", "--port"):
+            try:
+                options["port"] = int(value)
+            except ValueError:
+                _usage_error(
+                    _SERVE_HELP, f"argument {name}: invalid int value: '{value}'"
+                )
+        else:
+            options["host"] = value
+    return options
+
+
+def cli():
+    """命令行入口 - 供 uv tool install 后使用
+
+    只有一个 serve 子命令，手写参数解析以免启动时导入 argparse（及其依赖的 gettext 等）。
+    """
+    argv = sys.argv[1:]
+    if not argv or argv[0] in ("-h", "--help"):
+        sys.stdout.write(_MAIN_HELP)
+        return
+
+    command, rest = argv[0], argv[1:]
+    if command != "serve":
+        _usage_error(
+            _MAIN_HELP,
+            f"argument command: invalid choice: '{command}' (choose from 'serve')",
         )
-    else:
-        parser.print_help()
+
+    options = _parse_serve_args(rest)
+
+    import uvicorn
+
+    uvicorn.run(
+        "autopilot.cli:create_app",
+        factory=True,
+        host=options["host"],
+        port=options["port"],
+        reload=options["reload"],
+    )
 
 
 if __name__ == "__main__":
@@ -34,3 +34,6 @@ class JobConfig(BaseModel):
     # 提示词配置
     override_system_message: str | None = None  # 完全覆盖系统提示词
     extend_system_message: str | None = None  # 追加到系统提示词末尾
+
+    # 回调配置
+    callback_batch: bool = False  # 合并 task 更新到 /task/batch（需 Server 支持）
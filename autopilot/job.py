@@ -7,23 +7,36 @@ Job 模型：持有 Job 数据并负责串行执行多个任务
 - 支持回调 Server 更新状态（Server 集成模式）
 """
 
+import asyncio
 import logging
 import uuid
+from collections import Counter
 from datetime import datetime
 from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+from pydantic.dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
 from .callback import CallbackClient
 from .config import JobConfig
-from .task import TaskResult, TaskRunner, TaskStatus
+from .task import (
+    COMPLETED,
+    FAILED,
+    PENDING,
+    RUNNING,
+    TaskResult,
+    TaskRunner,
+    TaskStatus,
+    utcnow,
+)
 from .task_action import TaskActionHandler
 
 
-class TaskInput(BaseModel):
-    """单个任务输入（Server 集成时使用）"""
+@dataclass
+class TaskInput:
+    """单个任务输入（Server 集成时使用；轻量 dataclass，每个 task 都会校验一次）"""
 
     id: str  # 来源的叶子节点 TaskRow id
     text: str  # 任务文本
@@ -35,8 +48,8 @@ class Job(BaseModel):
     """
 
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    status: TaskStatus = TaskStatus.PENDING
-    created_at: datetime = Field(default_factory=datetime.now)
+    status: TaskStatus = PENDING
+    created_at: datetime = Field(default_factory=utcnow)
     started_at: datetime | None = None
     completed_at: datetime | None = None
     tasks: list[TaskResult] = Field(default_factory=list)
@@ -48,6 +61,44 @@ class Job(BaseModel):
     _runner: TaskRunner | None = PrivateAttr(default=None)
     _stop_job: bool = PrivateAttr(default=False)
     _stop_reason: str = PrivateAttr(default="")
+    # 尚未进入终态（COMPLETED/FAILED）的 task 下标，兜底异常时只处理这些 task
+    _unfinished: set[int] = PrivateAttr(default_factory=set)
+    # 状态变化通知：每次变化 set 当前 Event 并换上新的，等待方拿到的都是"下一次变化"
+    _changed: asyncio.Event = PrivateAttr(default_factory=asyncio.Event)
+    # 序列化结果缓存：状态变化（_notify_change）时失效，查询接口无需每次重新序列化
+    _json_cache: bytes | None = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        # model_construct 同样会调用 model_post_init
+        self._unfinished = set(range(len(self.tasks)))
+
+    def _notify_change(self) -> None:
+        """状态已变化：清除序列化缓存，并唤醒所有等待变化的协程（长轮询等）
+
+        修改对外可见的字段（含 tasks 内的 TaskResult）后，必须在下一次 await 之前调用。
+        """
+        self._json_cache = None
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def dump_json(self) -> bytes:
+        """序列化为 JSON bytes（状态未变化时复用上次结果）"""
+        if self._json_cache is None:
+            self._json_cache = self.model_dump_json().encode()
+        return self._json_cache
+
+    async def wait_for_change(self, timeout: float) -> bool:
+        """
+        等待 Job 状态下一次变化
+
+        Returns:
+            timeout 内发生变化返回 True，超时返回 False
+        """
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
 
     @classmethod
     def create(
@@ -74,7 +125,7 @@ class Job(BaseModel):
                         task=task.text,
                         task_id=task.id,
                         task_index=idx,
-                        status=TaskStatus.PENDING,
+                        status=PENDING,
                     )
                 )
             else:
@@ -84,12 +135,17 @@ class Job(BaseModel):
                         task=task,
                         task_id="",
                         task_index=idx,
-                        status=TaskStatus.PENDING,
+                        status=PENDING,
                     )
                 )
 
-        return cls(
+        # 输入已在路由层校验、TaskResult 在进程内构造，跳过 Pydantic 重复校验
+        return cls.model_construct(
             id=job_id or str(uuid.uuid4()),
+            status=PENDING,
+            created_at=utcnow(),
+            started_at=None,
+            completed_at=None,
             tasks=task_results,
             config=config,
             callback_url=callback_url,
@@ -103,7 +159,7 @@ class Job(BaseModel):
             task_id: 为 None 时停止整个 Job（当前 task 失败 + 剩余 task 跳过）。
                      有值时只停止当前正在运行且 task_id 匹配的 task，后续 task 继续。
         """
-        if self.status != TaskStatus.RUNNING:
+        if self.status != RUNNING:
             return {
                 "success": False,
                 "message": f"Job is not running (status: {self.status})",
@@ -111,7 +167,7 @@ class Job(BaseModel):
 
         # 找到当前正在运行的 task
         running_task = next(
-            (t for t in self.tasks if t.status == TaskStatus.RUNNING), None
+            (t for t in self.tasks if t.status == RUNNING), None
         )
 
         if task_id is not None:
@@ -141,17 +197,19 @@ class Job(BaseModel):
     def _update_status(self):
         """按任务状态聚合更新 Job 状态（RUNNING > COMPLETED > FAILED > PENDING）"""
         if not self.tasks:
-            self.status = TaskStatus.PENDING
+            self.status = PENDING
             return
 
-        if any(t.status == TaskStatus.RUNNING for t in self.tasks):
-            self.status = TaskStatus.RUNNING
-        elif all(t.status == TaskStatus.COMPLETED for t in self.tasks):
-            self.status = TaskStatus.COMPLETED
-        elif any(t.status == TaskStatus.FAILED for t in self.tasks):
-            self.status = TaskStatus.FAILED
+        # 单次遍历统计各状态数量
+        counts = Counter(t.status for t in self.tasks)
+        if counts[RUNNING]:
+            self.status = RUNNING
+        elif counts[COMPLETED] == len(self.tasks):
+            self.status = COMPLETED
+        elif counts[FAILED]:
+            self.status = FAILED
         else:
-            self.status = TaskStatus.PENDING
+            self.status = PENDING
 
     async def run(self) -> None:
         """
@@ -160,27 +218,35 @@ class Job(BaseModel):
         说明：
         - 每个任务由 TaskRunner 执行并返回 TaskResult
         - 如发生未捕获异常（包含初始化阶段），会将未完成任务统一标记为 FAILED
-        - 如有 callback_url，每个 task 完成后会回调 Server
+        - 如有 callback_url，task 状态通过后台队列异步回调 Server，Job 完成前统一 flush
         """
-        callback = CallbackClient(self.callback_url)
-        self.started_at = datetime.now()
-        self.status = TaskStatus.RUNNING
+        callback = CallbackClient(self.callback_url, batch=self.config.callback_batch)
+        callback.start()
+        self.started_at = utcnow()
+        self.status = RUNNING
+        self._notify_change()
 
-        logger.info(f"Job {self.id} started with config: {self.config.model_dump()}")
+        # config 在 Job 运行期间不变，只 dump 一次（只读，供日志与每个 task 的 payload 复用）
+        config_dump = self.config.model_dump()
+        logger.info("Job %s started with config: %s", self.id, config_dump)
 
+        runner: TaskRunner | None = None
         try:
             runner = TaskRunner(config=self.config)
             self._runner = runner
+            # Job 内所有 task 复用同一个 LLM 与 Browser，避免每个 task 重启 Chrome
+            await runner.start()
             for idx, task_result in enumerate(self.tasks):
                 task_result.task_index = idx
 
                 # 检查 Job 是否被停止，跳过剩余 task
                 if self._stop_job:
-                    task_result.status = TaskStatus.FAILED
-                    task_result.started_at = datetime.now()
+                    task_result.status = FAILED
+                    task_result.started_at = utcnow()
                     task_result.completed_at = task_result.started_at
                     task_result.error = self._stop_reason
-                    await callback.report_task_update(
+                    self._unfinished.discard(idx)
+                    callback.enqueue_task_update(
                         task_index=idx,
                         task_id=task_result.task_id,
                         status=task_result.status.value,
@@ -189,21 +255,23 @@ class Job(BaseModel):
                         started_at=task_result.started_at,
                         completed_at=task_result.completed_at,
                     )
+                    self._notify_change()
                     continue
 
                 # 记录开始时间，便于外部轮询展示进度
-                task_result.status = TaskStatus.RUNNING
-                task_result.started_at = datetime.now()
+                task_result.status = RUNNING
+                task_result.started_at = utcnow()
 
-                # 上报 task 开始到 Server（此时 result 为 None）
-                await callback.report_task_update(
+                # 上报 task 开始到 Server（此时 result 与 completed_at 均为 None）
+                callback.enqueue_task_update(
                     task_index=idx,
                     task_id=task_result.task_id,
                     status="running",
                     result=None,
                     started_at=task_result.started_at,
-                    completed_at=task_result.started_at,  # 临时值
+                    completed_at=None,  # 运行中尚未完成
                 )
+                self._notify_change()
 
                 cloud_payload: dict[str, Any] | None = None
                 try:
@@ -222,23 +290,24 @@ class Job(BaseModel):
                         self._stop_reason = "Browser was closed during task execution"
 
                     # 由 Job 层统一设置停止原因（覆盖 TaskRunner 的通用消息）
-                    if self._stop_job and task_result.status == TaskStatus.FAILED:
+                    if self._stop_job and task_result.status == FAILED:
                         task_result.error = self._stop_reason
 
                     # 如果有 agent 历史，提取完整执行结果用于回调
-                    if hasattr(result, "_agent_history") and result._agent_history:
+                    if result._agent_history is not None:
                         handler = TaskActionHandler(result._agent_history)
-                        cloud_payload = handler.to_cloud_payload(
-                            config=self.config.model_dump()
-                        )
+                        cloud_payload = handler.to_cloud_payload(config=config_dump)
 
                 except Exception as e:
-                    task_result.status = TaskStatus.FAILED
+                    task_result.status = FAILED
                     task_result.error = str(e)
-                    task_result.completed_at = datetime.now()
+                    task_result.completed_at = utcnow()
+
+                if task_result.status in (COMPLETED, FAILED):
+                    self._unfinished.discard(idx)
 
                 # 上报 task 完成到 Server（携带完整执行结果）
-                await callback.report_task_update(
+                callback.enqueue_task_update(
                     task_index=idx,
                     task_id=task_result.task_id,
                     status=task_result.status.value,
@@ -247,28 +316,42 @@ class Job(BaseModel):
                     started_at=task_result.started_at,
                     completed_at=task_result.completed_at,
                 )
+                self._notify_change()
 
         except Exception as e:
             # 兜底异常：将 Job 及未完成任务统一标记为失败，避免出现"永远 RUNNING"
-            completed_at = datetime.now()
+            completed_at = utcnow()
             error = str(e)
-            for t in self.tasks:
-                if t.status in (TaskStatus.PENDING, TaskStatus.RUNNING):
-                    t.status = TaskStatus.FAILED
-                    t.completed_at = completed_at
-                    t.error = error
+            for idx in self._unfinished:
+                t = self.tasks[idx]
+                t.status = FAILED
+                t.completed_at = completed_at
+                t.error = error
+            self._unfinished.clear()
         finally:
+            # 先落定最终状态并通知轮询方，不等待浏览器归还（归还可能较慢）
             self._runner = None
             self._stop_job = False
             self._stop_reason = ""
-            self.completed_at = datetime.now()
+            self.completed_at = utcnow()
             self._update_status()
-
-            # 上报 Job 完成到 Server
-            await callback.report_job_complete(
-                status=self.status.value,
-                error=None,  # Job 级别的错误通过 tasks 体现
-                completed_at=self.completed_at,
-            )
-
-            await callback.close()
+            self._notify_change()
+
+            try:
+                if runner is not None:
+                    try:
+                        await runner.stop()
+                    except Exception as e:
+                        # 归还浏览器失败不能影响下面的回调上报
+                        logger.warning(
+                            "Failed to stop task runner for job %s: %s", self.id, e
+                        )
+                # 先等待排队的 task 更新全部送达，再上报 Job 完成到 Server
+                await callback.flush()
+                await callback.report_job_complete(
+                    status=self.status.value,
+                    error=None,  # Job 级别的错误通过 tasks 体现
+                    completed_at=self.completed_at,
+                )
+            finally:
+                await callback.close()
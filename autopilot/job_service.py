@@ -9,6 +9,9 @@ Job 服务层：负责 Job 的生命周期与对外查询
 
 import asyncio
 import logging
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from itertools import islice, takewhile
 
 from .config import JobConfig
 from .job import Job, TaskInput
@@ -23,12 +26,26 @@ class JobService:
 
     说明：
     - 当前实现为单进程内存存储
+    - 所有访问都在同一事件循环内且不跨 await，dict 操作本身是原子的，无需加锁
     - 如需多实例/重启不丢，后续可替换存储层为 Redis/DB
     """
 
     def __init__(self):
+        # 按创建顺序插入（dict 保序），列表查询直接倒序遍历，无需排序
         self._jobs: dict[str, Job] = {}
-        self._lock = asyncio.Lock()
+        # 状态二级索引：按状态分桶，过滤查询只扫描对应桶
+        self._by_status: dict[TaskStatus, dict[str, Job]] = {s: {} for s in TaskStatus}
+
+    def _unindex(self, job_id: str) -> None:
+        """从主存储与所有状态桶中移除 Job"""
+        self._jobs.pop(job_id, None)
+        for bucket in self._by_status.values():
+            bucket.pop(job_id, None)
+
+    def _move(self, job: Job, old: TaskStatus, new: TaskStatus) -> None:
+        """Job 状态变化后，把它从旧状态桶移到新状态桶"""
+        self._by_status[old].pop(job.id, None)
+        self._by_status[new][job.id] = job
 
     async def create_job(
         self,
@@ -59,8 +76,10 @@ class JobService:
             callback_url=callback_url,
         )
 
-        async with self._lock:
-            self._jobs[job.id] = job
+        # 同一 job_id 重复提交时覆盖旧记录，并保持按创建顺序排列
+        self._unindex(job.id)
+        self._jobs[job.id] = job
+        self._by_status[job.status][job.id] = job
 
         asyncio.create_task(self._run_job(job.id))
 
@@ -68,28 +87,49 @@ class JobService:
 
     async def get_job(self, job_id: str) -> Job:
         """获取指定 Job（不存在则抛 KeyError）"""
-        async with self._lock:
-            job = self._jobs.get(job_id)
+        job = self._jobs.get(job_id)
         if not job:
             raise KeyError("Job not found")
         return job
 
-    async def list_jobs(self, status: TaskStatus | None = None) -> list[Job]:
+    async def list_jobs(
+        self,
+        status: TaskStatus | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+        since: datetime | None = None,
+    ) -> list[Job]:
         """
         列出 Jobs
 
         Args:
             status: 按状态过滤
+            limit: 最多返回条数（None 表示不限制）
+            offset: 跳过前 offset 条（分页）
+            since: 只返回该时间及之后创建的 Job（无时区时按 UTC 处理）
 
         Returns:
             Job 列表（按创建时间倒序）
         """
-        async with self._lock:
-            jobs = list(self._jobs.values())
-        if status:
-            jobs = [j for j in jobs if j.status == status]
-        jobs.sort(key=lambda j: j.created_at, reverse=True)
-        return jobs
+        if since is not None and since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+
+        if not status:
+            jobs: Iterable[Job] = reversed(self._jobs.values())
+        else:
+            # Job.run 在 finally 中先落最终状态、再等待回调完成，期间仍在 RUNNING 桶里，
+            # 因此额外检查 RUNNING 桶（通常只有少量 Job），并以实际状态为准
+            candidates = self._by_status[status]
+            if status != TaskStatus.RUNNING:
+                candidates = {**candidates, **self._by_status[TaskStatus.RUNNING]}
+            jobs = [j for j in candidates.values() if j.status == status]
+            jobs.sort(key=lambda j: j.created_at, reverse=True)
+
+        if since is not None:
+            # 已按创建时间倒序：遇到早于 since 的 Job 即可停止
+            jobs = takewhile(lambda j: j.created_at >= since, jobs)
+        stop = None if limit is None else offset + limit
+        return list(islice(jobs, offset, stop))
 
     async def get_job_tasks(self, job_id: str) -> list[TaskResult]:
         """获取指定 Job 的任务列表"""
@@ -116,8 +156,7 @@ class JobService:
         job = await self.get_job(job_id)
         if job.status == TaskStatus.RUNNING:
             raise ValueError("Cannot delete a running job")
-        async with self._lock:
-            self._jobs.pop(job_id, None)
+        self._unindex(job_id)
 
     async def _run_job(self, job_id: str) -> None:
         """执行 Job（内部调度入口：捕获异常并落到 Job 状态上）"""
@@ -126,11 +165,16 @@ class JobService:
         except KeyError:
             return
 
+        # job.run() 在首次 await 前就会把状态置为 RUNNING，这里同步移桶
+        self._move(job, TaskStatus.PENDING, TaskStatus.RUNNING)
         try:
             await job.run()
         except Exception as e:
             # Job.run 已做兜底并尽量不抛异常；这里仅作为最后保险，避免 background task 泄漏异常。
             logger.exception("Unexpected error while running job_id=%s: %s", job_id, e)
+        finally:
+            if self._jobs.get(job_id) is job:
+                self._move(job, TaskStatus.RUNNING, job.status)
 
 
 # 模块级单例：在 FastAPI 进程内复用同一个 JobService
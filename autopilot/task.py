@@ -6,25 +6,68 @@
 - 初始化 LLM / Browser 并执行单个任务
 """
 
+import asyncio
 import logging
 import os
+import threading
 import time
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Any
+from types import MappingProxyType
+from typing import Annotated, Any
 
 import psutil
 from browser_use import Agent, Browser
 from browser_use.llm import ChatGoogle
+from pydantic import Field
 
 from utils.chrome_profile import resolve_chrome_user_data_dir
 
+from .browser_pool import DEAD_PROCESS_STATUSES, get_browser_pool, reset_browser
 from .bundled_assets import resolve_bundled_asset_path
 from .config import JobConfig
 
 logger = logging.getLogger(__name__)
 
+# focus 丢失检测参数：should_stop 热路径直接读模块全局，省去类属性 MRO 查找
+_FOCUS_LOSS_GRACE_SECONDS = 1.5
+_FOCUS_RECOVERY_TIMEOUT_SECONDS = 0.5
+
+
+# 环境变量在进程内不变，导入时读取一次（browser-use 导入时已加载 .env）
+_LLM_API_KEY = os.getenv("ELE_LLM_API_KEY")
+
+# 进程级 LLM 客户端缓存：key 为构造参数，跨 Job/TaskRunner 复用 HTTP 连接池
+_LLM_SINGLETONS: dict[tuple, ChatGoogle] = {}
+_LLM_LOCK = threading.Lock()  # LLM 在线程中构造（见 TaskRunner.start），需加锁
+
+
+def _get_or_create_llm(model: str, api_key: str | None) -> ChatGoogle:
+    """按构造参数取缓存的 LLM 客户端，没有则创建"""
+    temperature = 0.0
+    max_output_tokens = 65536
+    key = (model, api_key, temperature, max_output_tokens)
+    with _LLM_LOCK:
+        llm = _LLM_SINGLETONS.get(key)
+        if llm is None:
+            llm = _LLM_SINGLETONS[key] = ChatGoogle(
+                model=model,
+                api_key=api_key,
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+            )
+    return llm
+
+
+_now = datetime.now
+_UTC = timezone.utc
+
+
+def utcnow() -> datetime:
+    """当前 UTC 时间（带时区，避免本地时区查询与歧义）"""
+    return _now(_UTC)
+
 
 class TaskStatus(str, Enum):
     """任务生命周期状态（用于 Job 聚合与对外查询）"""
@@ -35,7 +78,14 @@ class TaskStatus(str, Enum):
     FAILED = "failed"
 
 
-@dataclass
+# 状态常量别名：热路径（状态聚合/循环判断）直接引用模块全局，省去 Enum 类属性查找
+PENDING = TaskStatus.PENDING
+RUNNING = TaskStatus.RUNNING
+COMPLETED = TaskStatus.COMPLETED
+FAILED = TaskStatus.FAILED
+
+
+@dataclass(slots=True)
 class TaskResult:
     """单个任务的执行记录（结果与错误二选一）"""
 
@@ -47,28 +97,47 @@ class TaskResult:
     completed_at: datetime | None = None
     result: Any = None
     error: str | None = None
+    # TaskRunner 保存的 AgentHistoryList，仅用于生成云端 payload，不参与对外序列化
+    _agent_history: Annotated[Any, Field(exclude=True)] = field(
+        default=None, repr=False, compare=False
+    )
 
 
-@dataclass
+@dataclass(slots=True)
 class _ShouldStopState:
     """should_stop 回调的内部状态"""
 
     browser_pid: int | None = None
+    proc: psutil.Process | None = None  # 浏览器进程句柄（PID 不变，跨 step 复用）
     had_focus: bool = False
     focus_lost_since: float | None = None
+    last_check: float = 0.0  # 上次完整检查的 time.monotonic()
 
 
 class TaskRunner:
-    """单个任务执行器：为每次执行创建 Agent，并负责资源清理"""
+    """任务执行器：为每次执行创建 Agent，并负责资源清理
 
-    _FOCUS_LOSS_GRACE_SECONDS = 1.5
-    _FOCUS_RECOVERY_TIMEOUT_SECONDS = 0.5
+    Browser 从进程级 BrowserPool 借出（keep_alive，跨 Job 复用以省去 Chrome 冷启动）。
+    调用 start() 后，多次 run() 复用同一个 Browser，由 stop() 统一归还；
+    未调用 start() 时，每次 run() 独立借出并归还 Browser。
+    """
+
+    # 保留类属性别名（兼容外部引用），内部使用模块常量
+    _FOCUS_LOSS_GRACE_SECONDS = _FOCUS_LOSS_GRACE_SECONDS
+    _FOCUS_RECOVERY_TIMEOUT_SECONDS = _FOCUS_RECOVERY_TIMEOUT_SECONDS
+    _SHOULD_STOP_CHECK_INTERVAL_SECONDS = 0.25
 
     def __init__(self, config: JobConfig):
         self.config = config
         self._llm = None
         self._current_agent: Agent | None = None
         self._browser_closed: bool = False
+        self._browser: Browser | None = None  # start() 后跨 task 复用的浏览器
+        self._browser_used = False  # 复用的浏览器是否已执行过 task（需重置后再用）
+        # 浏览器池 key：影响浏览器启动参数的配置不同时不能复用
+        self._browser_key = config.headless
+        # config 在 runner 生命周期内不变，Agent 参数只构建一次（只读，供每次 run 解包）
+        self._agent_kwargs = MappingProxyType(self._build_agent_kwargs())
 
     @property
     def browser_closed(self) -> bool:
@@ -76,26 +145,34 @@ class TaskRunner:
         return self._browser_closed
 
     @staticmethod
-    def _get_browser_pid(browser: Browser) -> int | None:
-        """从 BrowserSession 获取本地浏览器进程 PID"""
+    def _get_browser_process(browser: Browser) -> psutil.Process | None:
+        """从 BrowserSession 获取本地浏览器进程句柄（watchdog 持有的 psutil.Process）"""
         try:
             watchdog = browser._local_browser_watchdog
-            if watchdog and watchdog._subprocess:
-                return watchdog._subprocess.pid
+            if watchdog:
+                return watchdog._subprocess
         except Exception:
             pass
         return None
 
     @staticmethod
-    def _acquire_browser_pid(browser: Browser, current_pid: int | None) -> int | None:
-        """懒加载浏览器 PID（进程启动后才可获取）"""
-        if current_pid is not None:
-            return current_pid
+    def _get_browser_pid(browser: Browser) -> int | None:
+        """从 BrowserSession 获取本地浏览器进程 PID"""
+        proc = TaskRunner._get_browser_process(browser)
+        return proc.pid if proc is not None else None
 
-        pid = TaskRunner._get_browser_pid(browser)
-        if pid is not None:
-            logger.info(f"Browser process watchdog acquired pid={pid}")
-        return pid
+    @staticmethod
+    def _acquire_browser_process(browser: Browser, state: _ShouldStopState) -> None:
+        """懒加载浏览器进程句柄与 PID（进程启动后才可获取）"""
+        if state.browser_pid is not None:
+            return
+
+        proc = TaskRunner._get_browser_process(browser)
+        if proc is not None:
+            # 直接复用 watchdog 的句柄，无需再按 PID 构造 psutil.Process
+            state.proc = proc
+            state.browser_pid = proc.pid
+            logger.info("Browser process watchdog acquired pid=%s", proc.pid)
 
     def _mark_browser_closed(self, message: str, *args) -> bool:
         """统一记录浏览器关闭并返回 stop 信号"""
@@ -103,21 +180,22 @@ class TaskRunner:
         self._browser_closed = True
         return True
 
-    def _is_browser_process_closed(self, browser_pid: int | None) -> bool:
+    def _is_browser_process_closed(self, state: _ShouldStopState) -> bool:
         """检查 Chrome 进程是否已退出"""
+        browser_pid = state.browser_pid
         if browser_pid is None:
             return False
 
         try:
-            proc = psutil.Process(browser_pid)
-            if not proc.is_running() or proc.status() in (
-                psutil.STATUS_ZOMBIE,
-                psutil.STATUS_DEAD,
-            ):
+            proc = state.proc
+            if proc is None:
+                proc = state.proc = psutil.Process(browser_pid)
+            if not proc.is_running() or proc.status() in DEAD_PROCESS_STATUSES:
                 return self._mark_browser_closed(
                     "Browser process %s is no longer running", browser_pid
                 )
         except psutil.NoSuchProcess:
+            state.proc = None
             return self._mark_browser_closed(
                 "Browser process %s no longer exists", browser_pid
             )
@@ -131,7 +209,10 @@ class TaskRunner:
     @staticmethod
     async def _try_recover_focus(browser: Browser, timeout_seconds: float) -> bool:
         """尝试通过 browser-use 内置机制恢复 focus"""
-        session_manager = getattr(browser, "session_manager", None)
+        try:
+            session_manager = browser.session_manager
+        except AttributeError:
+            return False
         if session_manager is None:
             return False
 
@@ -160,11 +241,11 @@ class TaskRunner:
             return False
 
         elapsed = now - state.focus_lost_since
-        if elapsed < self._FOCUS_LOSS_GRACE_SECONDS:
+        if elapsed < _FOCUS_LOSS_GRACE_SECONDS:
             return False
 
         recovered = await TaskRunner._try_recover_focus(
-            browser, timeout_seconds=self._FOCUS_RECOVERY_TIMEOUT_SECONDS
+            browser, timeout_seconds=_FOCUS_RECOVERY_TIMEOUT_SECONDS
         )
         if recovered:
             state.focus_lost_since = None
@@ -175,7 +256,11 @@ class TaskRunner:
             elapsed,
         )
 
-    def _make_should_stop_callback(self, browser: Browser):
+    def _make_should_stop_callback(
+        self,
+        browser: Browser,
+        poll_interval: float = _SHOULD_STOP_CHECK_INTERVAL_SECONDS,
+    ):
         """构建 Agent should_stop 回调：检测浏览器是否仍可用
 
         检测两种场景：
@@ -183,15 +268,23 @@ class TaskRunner:
         2. Tab/Window 被关闭但 Chrome 还在 → agent_focus_target_id 丢失
 
         使用闭包延迟获取 PID，因为浏览器进程在 Agent.run() 过程中才实际启动。
+
+        Args:
+            browser: 当前 task 使用的浏览器
+            poll_interval: 两次完整检查的最小间隔（秒），间隔内的调用直接返回 False
         """
         state = _ShouldStopState()
 
         async def should_stop() -> bool:
-            state.browser_pid = TaskRunner._acquire_browser_pid(
-                browser, state.browser_pid
-            )
+            # 节流：PID 已获取后，两次完整检查至少间隔 poll_interval（默认远小于 focus 宽限期）
+            now = time.monotonic()
+            if state.browser_pid is not None and now - state.last_check < poll_interval:
+                return False
+            state.last_check = now
 
-            if self._is_browser_process_closed(state.browser_pid):
+            TaskRunner._acquire_browser_process(browser, state)
+
+            if self._is_browser_process_closed(state):
                 return True
 
             return await self._is_focus_lost_persistently(browser, state)
@@ -207,24 +300,24 @@ class TaskRunner:
         return False
 
     def _init_llm(self):
-        """初始化 LLM，model 通过 config 传入，api_key 通过环境变量配置"""
+        """初始化 LLM，model 通过 config 传入，api_key 通过环境变量配置
+
+        客户端为进程级缓存，相同配置的 TaskRunner 共用同一个实例。
+        """
         if self._llm is None:
-            self._llm = ChatGoogle(
-                model=self.config.gemini_model,
-                api_key=os.getenv("ELE_LLM_API_KEY"),
-                temperature=0.0,
-                max_output_tokens=65536,
-            )
+            self._llm = _get_or_create_llm(self.config.gemini_model, _LLM_API_KEY)
         return self._llm
 
     async def _init_browser(self) -> Browser:
-        """初始化浏览器实例"""
+        """初始化浏览器实例（keep_alive：Agent 结束后不关闭，归还到浏览器池复用）"""
         chrome_executable_path = (
             "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
         )
         chrome_user_data_dir = "~/Library/Application Support/Google/Chrome"
         profile_directory = "Default"
-        resolved_user_data_dir = resolve_chrome_user_data_dir(
+        # 首次调用可能需要种子复制整个 Chrome profile，放到线程中避免阻塞事件循环
+        resolved_user_data_dir = await asyncio.to_thread(
+            resolve_chrome_user_data_dir,
             chrome_executable_path=chrome_executable_path,
             chrome_user_data_dir=chrome_user_data_dir,
             profile_directory=profile_directory,
@@ -236,21 +329,46 @@ class TaskRunner:
             user_data_dir=resolved_user_data_dir,
             profile_directory=profile_directory,
             headless=self.config.headless,
-            keep_alive=False,
+            keep_alive=True,
             args=["--start-maximized", "--test-type=webdriver"],
             # If the bad-flags prompt still needs a targeted workaround later,
             # restore ignore_default_args here to drop only
             # `--extensions-on-chrome-urls` from browser-use defaults.
         )
 
-    async def _cleanup(self, browser: Browser | None):
-        """清理浏览器资源"""
-        if browser is None:
+    async def start(self) -> None:
+        """准备跨 task 复用的 LLM 与 Browser（Job 开始前调用一次）
+
+        LLM 在线程中构造，与（可能需要等待其他 Job 归还的）浏览器借出并发进行。
+        """
+        if self._browser is not None:
+            self._init_llm()
             return
-        try:
-            await browser.stop()
-        except Exception:
-            pass
+
+        llm, browser = await asyncio.gather(
+            asyncio.to_thread(self._init_llm),
+            get_browser_pool().acquire(self._browser_key, self._init_browser),
+            return_exceptions=True,
+        )
+        if isinstance(browser, BaseException):
+            raise browser
+        self._browser = browser
+        if isinstance(llm, BaseException):
+            # LLM 初始化失败时归还已借出的浏览器
+            await self.stop()
+            raise llm
+
+    async def stop(self) -> None:
+        """把复用的 Browser 归还到浏览器池（Job 结束时调用）
+
+        浏览器已被用户关闭时直接关闭，不再放回池中。
+        """
+        browser, self._browser = self._browser, None
+        self._browser_used = False
+        if browser is not None:
+            await get_browser_pool().release(
+                self._browser_key, browser, discard=self._browser_closed
+            )
 
     def _build_agent_kwargs(self) -> dict:
         """构建 Agent 初始化参数：只包含 config 中有值的参数"""
@@ -278,7 +396,7 @@ class TaskRunner:
 
         for agent_param, config_field in str_param_mapping.items():
             value = getattr(self.config, config_field, None)
-            if value:  # 同时排除 None 和空字符串
+            if value is not None and value != "":  # 同时排除 None 和空字符串
                 kwargs[agent_param] = value
 
         return kwargs
@@ -286,18 +404,25 @@ class TaskRunner:
         """执行单个任务并返回可序列化的执行记录"""
         task_result = TaskResult(task=task)
         task_result.status = TaskStatus.RUNNING
-        task_result.started_at = datetime.now()
+        task_result.started_at = utcnow()
         self._browser_closed = False
 
-        browser: Browser | None = None
+        # 已 start() 则复用共享浏览器，否则本次 run 独立借出并在结束时归还
+        owns_browser = self._browser is None
         try:
+            if owns_browser:
+                await self.start()
             llm = self._init_llm()
-            browser = await self._init_browser()
-
-            # 构建 Agent 参数：只传递 config 中有值的参数，其余使用 Agent 默认值
-            agent_kwargs = self._build_agent_kwargs()
+            browser = self._browser
+            if self._browser_used:
+                # 上一个 task 留下的标签页与页面状态不带入本 task（失败时仍继续执行）
+                await reset_browser(browser)
+            self._browser_used = True
+
+            # Agent 参数：只传递 config 中有值的参数，其余使用 Agent 默认值
+            agent_kwargs = self._agent_kwargs
             logger.info(
-                f"Creating Agent with task={task!r}, agent_kwargs={agent_kwargs}"
+                "Creating Agent with task=%r, agent_kwargs=%s", task, agent_kwargs
             )
 
             agent = Agent(
@@ -323,14 +448,16 @@ class TaskRunner:
 
             # 保存 agent history 用于生成云端 payload
             # result 是 AgentHistoryList 类型
-            task_result._agent_history = result  # type: ignore[attr-defined]
+            task_result._agent_history = result
 
         except Exception as e:
             task_result.status = TaskStatus.FAILED
             task_result.error = str(e)
         finally:
             self._current_agent = None
-            await self._cleanup(browser)
+            if owns_browser or self._browser_closed:
+                # 共享浏览器已被用户关闭时也立即丢弃，以免后续 task 复用失效的会话
+                await self.stop()
 
-        task_result.completed_at = datetime.now()
+        task_result.completed_at = utcnow()
         return task_result
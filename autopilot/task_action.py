@@ -165,34 +165,43 @@ AgentHistoryList
 ====================================================================
 """
 
-import json
 import logging
 import platform
 import sys
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass, fields
 from dataclasses import is_dataclass
 from datetime import datetime
+from functools import lru_cache
 from importlib import metadata
 from pathlib import Path
-from typing import Any
-
-from pydantic import BaseModel
-
-# browser-use 类型导入（用于类型提示/IDE 补全）
-from browser_use.agent.views import (
-    ActionResult,
-    AgentHistory,
-    AgentHistoryList,
-    AgentOutput,
-    JudgementResult,
-    StepMetadata,
-)
-from browser_use.browser.views import BrowserStateHistory, TabInfo
+from typing import TYPE_CHECKING, Annotated, Any, Iterator
+
+from pydantic import BaseModel, PlainSerializer, TypeAdapter
+
+# 运行时需要：_StepMetadataDump 继承 StepMetadata，_TAB_LIST_ADAPTER 基于 TabInfo 构建
+from browser_use.agent.views import StepMetadata
+from browser_use.browser.views import TabInfo
+
+# browser-use 类型导入（仅用于类型提示/IDE 补全）
+if TYPE_CHECKING:
+    from browser_use.agent.views import AgentHistoryList
 
 logger = logging.getLogger(__name__)
 
 _EPOCH_MS_THRESHOLD = 10_000_000_000  # >= 1e10 认为是毫秒，否则按秒处理
 
+# 需要统一转换为毫秒时间戳的字段名
+_TS_KEYS = frozenset(
+    {
+        "timestamp",
+        "created_at",
+        "started_at",
+        "completed_at",
+        "step_start_time",
+        "step_end_time",
+    }
+)
+
 
 def _coerce_epoch_ms(value: Any) -> int | None:
     """
@@ -203,6 +212,17 @@ def _coerce_epoch_ms(value: Any) -> int | None:
     - int/float（自动判断秒/毫秒）
     - ISO 字符串（尽力解析；失败返回 None）
     """
+    # 快速路径：最常见的是 StepMetadata 的 float 秒时间戳（时间戳不为负，无需 abs）
+    value_type = type(value)
+    if value_type is float or value_type is int:
+        if value >= _EPOCH_MS_THRESHOLD:
+            return int(value)
+        return int(value * 1000)
+    return _coerce_epoch_ms_slow(value)
+
+
+def _coerce_epoch_ms_slow(value: Any) -> int | None:
+    """_coerce_epoch_ms 的慢路径：None / datetime / int/float 子类 / ISO 字符串"""
     if value is None:
         return None
     if isinstance(value, datetime):
@@ -240,16 +260,25 @@ def _coerce_datetime(value: Any) -> datetime | None:
     return None
 
 
+def _shallow_asdict(obj: Any) -> dict[str, Any]:
+    """dataclass 浅层转 dict（asdict 会深拷贝所有嵌套容器）"""
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
+
+_PRIMS = frozenset({str, int, float, bool, type(None)})
+
+
 def _safe_dump(obj: Any) -> Any:
     """
     把对象尽可能转成 JSON 兼容结构（dict/list/str/int/float/bool/None）。
 
     目标：
-    - 固定 pydantic v2（BaseModel.model_dump）
-    - 兼容 dataclass（asdict）
+    - 固定 pydantic v2（BaseModel.model_dump(mode="json") 的输出已是 JSON 原生结构，直接返回）
+    - 兼容 dataclass（浅层取字段后递归）
     - 兼容 Path / datetime
     """
-    if obj is None or isinstance(obj, (str, int, float, bool)):
+    # 快速路径：绝大多数叶子节点是精确的基本类型，一次集合查找即可
+    if type(obj) in _PRIMS:
         return obj
 
     if isinstance(obj, datetime):
@@ -262,14 +291,7 @@ def _safe_dump(obj: Any) -> Any:
         converted: dict[str, Any] = {}
         for k, v in obj.items():
             key = str(k)
-            if key in {
-                "timestamp",
-                "created_at",
-                "started_at",
-                "completed_at",
-                "step_start_time",
-                "step_end_time",
-            }:
+            if key in _TS_KEYS:
                 ms = _coerce_epoch_ms(v)
                 converted[key] = ms if ms is not None else _safe_dump(v)
                 continue
@@ -279,14 +301,15 @@ def _safe_dump(obj: Any) -> Any:
     if isinstance(obj, (list, tuple, set)):
         return [_safe_dump(v) for v in obj]
 
-    if is_dataclass(obj):
-        try:
-            return _safe_dump(asdict(obj))
-        except Exception:
-            pass
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return _safe_dump(_shallow_asdict(obj))
 
     if isinstance(obj, BaseModel):
-        return _safe_dump(obj.model_dump(exclude_none=False, mode="json"))
+        return obj.model_dump(exclude_none=False, mode="json")
+
+    # 基本类型的子类（如 str 枚举）原样返回
+    if isinstance(obj, (str, int, float, bool)):
+        return obj
 
     # 兜底：尽量不要抛异常，返回 string 表示
     try:
@@ -295,6 +318,18 @@ def _safe_dump(obj: Any) -> Any:
         return repr(obj)
 
 
+# 毫秒时间戳字段：由 pydantic 在序列化时直接转换，无需再遍历 dump 结果
+_EpochMs = Annotated[float, PlainSerializer(_coerce_epoch_ms, return_type=int)]
+
+
+class _StepMetadataDump(StepMetadata):
+    """StepMetadata 的序列化视图：step_start_time/step_end_time 输出为毫秒时间戳"""
+
+    step_start_time: _EpochMs
+    step_end_time: _EpochMs
+
+
+@lru_cache(maxsize=None)
 def _get_pkg_version(package: str) -> str | None:
     try:
         return metadata.version(package)
@@ -302,7 +337,16 @@ def _get_pkg_version(package: str) -> str | None:
         return None
 
 
+# 运行环境信息在进程内不变（metadata.version 会扫描 sys.path，platform.platform 可能调用 uname）
+_RUNTIME_INFO_CACHE: dict[str, Any] | None = None
+
+
 def _build_runtime_info() -> dict[str, Any]:
+    """返回运行环境信息（首次调用时构建并缓存，调用方不要修改返回的 dict）"""
+    global _RUNTIME_INFO_CACHE
+    if _RUNTIME_INFO_CACHE is not None:
+        return _RUNTIME_INFO_CACHE
+
     info: dict[str, Any] = {
         "python": {
             "version": sys.version,
@@ -323,6 +367,7 @@ def _build_runtime_info() -> dict[str, Any]:
     except Exception:
         pass
 
+    _RUNTIME_INFO_CACHE = info
     return info
 
 
@@ -387,13 +432,18 @@ class StepDetail:
     step_start_time: int | None  # 毫秒时间戳(epoch ms)
     step_end_time: int | None  # 毫秒时间戳(epoch ms)
     metadata: dict | None
-    state: str | None
+    state: dict | None  # BrowserStateHistory.to_dict()
+
+
+# 模块级构建一次：由 pydantic-core 直接输出 JSON 兼容结构，替代 asdict + _safe_dump
+_SUMMARY_ADAPTER = TypeAdapter(TaskActionSummary)
+_TAB_LIST_ADAPTER = TypeAdapter(list[TabInfo])
 
 
 class TaskActionHandler:
     """处理 Agent.run() 结果的处理器"""
 
-    def __init__(self, result: AgentHistoryList):
+    def __init__(self, result: "AgentHistoryList"):
         """
         初始化处理器
 
@@ -402,27 +452,6 @@ class TaskActionHandler:
         """
         self.result = result
 
-    def _derive_task_times(self) -> tuple[datetime | None, datetime | None]:
-        """尽量从 StepMetadata 中推导任务开始/结束时间。"""
-        if not self.result.history:
-            return None, None
-
-        starts: list[datetime] = []
-        ends: list[datetime] = []
-
-        for history_item in self.result.history:
-            md = history_item.metadata
-            if not md:
-                continue
-            st = _coerce_datetime(md.step_start_time)
-            et = _coerce_datetime(md.step_end_time)
-            if st:
-                starts.append(st)
-            if et:
-                ends.append(et)
-
-        return (min(starts) if starts else None, max(ends) if ends else None)
-
     def extract_summary(self) -> TaskActionSummary:
         """
         提取任务执行摘要
@@ -431,18 +460,61 @@ class TaskActionHandler:
             TaskActionSummary 对象
         """
 
-        # 错误（step 粒度）列表（过滤 None）
-        step_errors = [e for e in self.result.errors() if e is not None]
+        # 单次遍历 history，同时收集错误/提取内容/URL/动作/时间
+        # （等价于 errors()/action_results()/extracted_content()/urls()/
+        #  model_actions()/action_names() 及 StepMetadata 时间推导各自遍历一次）
+        step_errors: list[str] = []  # step 粒度：每步取第一个错误
+        action_errors: list[str] = []  # action 粒度
+        extracted_content: list[str] = []
+        visited_urls: list[str] = []
+        action_names: list[str] = []
+        total_actions = 0
+        started_at: datetime | None = None
+        completed_at: datetime | None = None
 
-        # 错误（action 粒度）列表
-        action_errors = [r.error for r in self.result.action_results() if r.error]
+        for history_item in self.result.history:
+            step_error = None
+            for r in history_item.result:
+                if r.error:
+                    action_errors.append(r.error)
+                    if step_error is None:
+                        step_error = r.error
+                if r.extracted_content:
+                    extracted_content.append(r.extracted_content)
+            if step_error is not None:
+                step_errors.append(step_error)
 
-        # 获取时间信息
-        duration = self.result.total_duration_seconds()
-        started_at, completed_at = self._derive_task_times()
+            state = history_item.state
+            if state.url:
+                visited_urls.append(str(state.url))
+
+            model_output = history_item.model_output
+            if model_output:
+                actions = model_output.action
+                # 与 model_actions() 一致：按 interacted_element 长度截断（zip 语义）
+                interacted = state.interacted_element
+                if interacted:
+                    actions = actions[: len(interacted)]
+                total_actions += len(actions)
+                for action in actions:
+                    action_dump = action.model_dump(exclude_none=True, mode="json")
+                    if action_dump:
+                        action_names.append(next(iter(action_dump)))
 
+            md = history_item.metadata
+            if md:
+                st = _coerce_datetime(md.step_start_time)
+                et = _coerce_datetime(md.step_end_time)
+                if st and (started_at is None or st < started_at):
+                    started_at = st
+                if et and (completed_at is None or et > completed_at):
+                    completed_at = et
+
+        # 获取时间信息（起止时间齐全时直接相减，缺失时才回退到逐步累加耗时）
         if started_at and completed_at:
             duration = max(0.0, (completed_at - started_at).total_seconds())
+        else:
+            duration = self.result.total_duration_seconds()
 
         is_done = self.result.is_done()
         is_successful = self.result.is_successful()
@@ -459,15 +531,15 @@ class TaskActionHandler:
             completed_at=_coerce_epoch_ms(completed_at),
             duration_seconds=duration,
             total_steps=self.result.number_of_steps(),
-            total_actions=len(self.result.model_actions()),
+            total_actions=total_actions,
             step_error_count=len(step_errors),
             action_error_count=len(action_errors),
             final_result=self.result.final_result(),
             judgement=self.result.judgement(),
             is_validated=self.result.is_validated(),
-            all_extracted_content=self.result.extracted_content(),
-            visited_urls=[str(u) for u in self.result.urls() if u],
-            action_sequence=self.result.action_names(),
+            all_extracted_content=extracted_content,
+            visited_urls=visited_urls,
+            action_sequence=action_names,
             errors=step_errors,
             action_errors=action_errors,
         )
@@ -479,8 +551,14 @@ class TaskActionHandler:
         Returns:
             StepDetail 对象列表
         """
-        steps = []
+        return [StepDetail(**step) for step in self._iter_step_dicts()]
 
+    def _iter_step_dicts(self) -> Iterator[dict[str, Any]]:
+        """
+        逐步产出单步详情 dict（字段同 StepDetail，值均已是 JSON 兼容结构）
+
+        to_cloud_payload 直接收集这些 dict，省去构造 StepDetail 再整体 dump 的一轮遍历。
+        """
         for idx, history_item in enumerate(self.result.history):
             state = history_item.state
             model_output_obj = history_item.model_output
@@ -511,39 +589,39 @@ class TaskActionHandler:
             metadata_dump: dict | None = None
             if md:
                 duration = md.duration_seconds
-                step_start_time = _coerce_epoch_ms(md.step_start_time)
-                step_end_time = _coerce_epoch_ms(md.step_end_time)
-                metadata_dump = _safe_dump(md)
-
-            # tabs
-            tabs = [_safe_dump(t) for t in state.tabs]
+                # 字段均来自已校验的 StepMetadata，model_construct 跳过重复校验
+                metadata_dump = _StepMetadataDump.model_construct(
+                    **md.__dict__
+                ).model_dump(mode="json")
+                step_start_time = metadata_dump["step_start_time"]
+                step_end_time = metadata_dump["step_end_time"]
+
+            # tabs（整表交给 pydantic-core 序列化，省去逐个 _safe_dump 分派）
+            tabs = _TAB_LIST_ADAPTER.dump_python(state.tabs, mode="json")
             # step screenshot
             thinking_image = state.get_screenshot()
 
-            steps.append(
-                StepDetail(
-                    step_number=md.step_number if md else (idx + 1),
-                    url=state.url,
-                    page_title=state.title,
-                    tabs=tabs,
-                    state_message=history_item.state_message,
-                    thinking=thinking,
-                    thinking_image=thinking_image,
-                    evaluation=evaluation,
-                    memory=memory,
-                    next_goal=next_goal,
-                    model_output=model_output_dump,
-                    results=results,
-                    duration_seconds=duration,
-                    step_start_time=step_start_time,
-                    step_end_time=step_end_time,
-                    metadata=metadata_dump,
-                    state=json.dumps(_safe_dump(state.to_dict())),
-                )
+            yield dict(
+                step_number=md.step_number if md else (idx + 1),
+                url=state.url,
+                page_title=state.title,
+                tabs=tabs,
+                state_message=history_item.state_message,
+                thinking=thinking,
+                thinking_image=thinking_image,
+                evaluation=evaluation,
+                memory=memory,
+                next_goal=next_goal,
+                model_output=model_output_dump,
+                results=results,
+                duration_seconds=duration,
+                step_start_time=step_start_time,
+                step_end_time=step_end_time,
+                metadata=metadata_dump,
+                # to_dict() 已是 JSON 原生结构，直接嵌套，避免逐步编码为字符串再被二次转义
+                state=state.to_dict(),
             )
 
-        return steps
-
     def to_cloud_payload(self, config: dict[str, Any] | None = None) -> dict[str, Any]:
         """
         生成用于云端上传的完整 payload
@@ -555,19 +633,19 @@ class TaskActionHandler:
             可序列化的字典
         """
         summary = self.extract_summary()
-        steps = self.extract_step_details()
 
         runtime = _build_runtime_info()
         if config:
-            runtime["config"] = config
+            runtime = {**runtime, "config": config}
 
         payload: dict[str, Any] = {
             "timestamp": _coerce_epoch_ms(datetime.now()),
             "runtime": runtime,
-            "summary": asdict(summary),
-            "steps": [asdict(step) for step in steps],
+            "summary": _SUMMARY_ADAPTER.dump_python(summary, mode="json"),
+            "steps": list(self._iter_step_dicts()),
         }
 
-        payload["raw_history"] = json.dumps(_safe_dump(self.result.model_dump()))
+        # 以嵌套对象而非 JSON 字符串上传，避免外层序列化时对整段历史二次转义
+        payload["raw_history"] = _safe_dump(self.result.model_dump())
 
-        return _safe_dump(payload)
+        return payload
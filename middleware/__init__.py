@@ -1,4 +1,5 @@
-from .response import ResponseWrapperMiddleware
+from .etag import NOT_MODIFIED_CACHE_CONTROL, compute_etag, etag_matches
+from .response import WRAPPED_HEADER, ResponseWrapperMiddleware
 from .exception import (
     http_exception_handler,
     validation_exception_handler,
@@ -7,6 +8,10 @@ from .exception import (
 )
 
 __all__ = [
+    "WRAPPED_HEADER",
+    "NOT_MODIFIED_CACHE_CONTROL",
+    "compute_etag",
+    "etag_matches",
     "ResponseWrapperMiddleware",
     "http_exception_handler",
     "validation_exception_handler",
@@ -0,0 +1,23 @@
+"""ETag 工具：为只读 GET 接口提供条件请求（If-None-Match → 304 Not Modified）"""
+
+import hashlib
+
+# 304 响应未另行指定缓存策略时使用：允许缓存，但每次使用前需重新验证
+NOT_MODIFIED_CACHE_CONTROL = "no-cache"
+
+
+def compute_etag(body: bytes) -> str:
+    """按响应体计算弱 ETag（blake2b 8 字节摘要，仅用于比较内容是否变化）"""
+    return f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """判断 If-None-Match 是否命中当前 ETag（弱比较：忽略 W/ 前缀）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
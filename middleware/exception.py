@@ -1,14 +1,50 @@
+import orjson
 from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
 from pydantic import ValidationError
 
+from .response import WRAPPED_HEADER
 
-async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
+# 异常响应体本身就是统一格式，标记后中间件无需再解析
+_WRAPPED_HEADERS = {WRAPPED_HEADER: "1"}
+
+# 500 响应体固定不变，导入时序列化一次
+_GENERIC_500_BODY = orjson.dumps(
+    {"code": 500, "message": "Internal Server Error", "data": None}
+)
+
+
+def _json_response(status_code: int, content: dict) -> Response:
+    """用 orjson 序列化统一格式的响应体（替代 JSONResponse 的标准库 json.dumps）"""
+    return Response(
+        content=orjson.dumps(content),
+        status_code=status_code,
+        headers=_WRAPPED_HEADERS,
+        media_type="application/json",
+    )
+
+
+def _validation_response(errors: list[dict]) -> Response:
+    """格式化参数验证错误，返回 422 统一格式响应"""
+    error_messages = [
+        f"{' -> '.join(map(str, error['loc']))}: {error['msg']}" for error in errors
+    ]
+    return _json_response(
+        422,
+        {
+            "code": 422,
+            "message": "Validation Error",
+            "data": {"errors": error_messages},
+        },
+    )
+
+
+async def http_exception_handler(request: Request, exc: HTTPException) -> Response:
     """处理 HTTP 异常，返回统一格式"""
-    return JSONResponse(
-        status_code=exc.status_code,
-        content={
+    return _json_response(
+        exc.status_code,
+        {
             "code": exc.status_code,
             "message": exc.detail if isinstance(exc.detail, str) else str(exc.detail),
             "data": None,
@@ -18,52 +54,21 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
 
 async def validation_exception_handler(
     request: Request, exc: RequestValidationError
-) -> JSONResponse:
+) -> Response:
     """处理请求参数验证异常"""
-    errors = exc.errors()
-    # 格式化错误信息
-    error_messages = []
-    for error in errors:
-        loc = " -> ".join(str(x) for x in error["loc"])
-        error_messages.append(f"{loc}: {error['msg']}")
-
-    return JSONResponse(
-        status_code=422,
-        content={
-            "code": 422,
-            "message": "Validation Error",
-            "data": {"errors": error_messages},
-        },
-    )
+    return _validation_response(exc.errors())
 
 
 async def pydantic_exception_handler(
     request: Request, exc: ValidationError
-) -> JSONResponse:
+) -> Response:
     """处理 Pydantic 验证异常"""
-    errors = exc.errors()
-    error_messages = []
-    for error in errors:
-        loc = " -> ".join(str(x) for x in error["loc"])
-        error_messages.append(f"{loc}: {error['msg']}")
+    return _validation_response(exc.errors())
 
-    return JSONResponse(
-        status_code=422,
-        content={
-            "code": 422,
-            "message": "Validation Error",
-            "data": {"errors": error_messages},
-        },
-    )
 
-
-async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def generic_exception_handler(request: Request, exc: Exception) -> Response:
     """处理未捕获的异常"""
-    return JSONResponse(
-        status_code=500,
-        content={
-            "code": 500,
-            "message": "Internal Server Error",
-            "data": None,
-        },
+    # Exception 处理器由最外层的 ServerErrorMiddleware 调用，响应不经过包装中间件，无需标记头
+    return Response(
+        content=_GENERIC_500_BODY, status_code=500, media_type="application/json"
     )
@@ -1,8 +1,16 @@
-import json
+import orjson
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import Response, StreamingResponse
-from fastapi.responses import JSONResponse
+from starlette.responses import Response
+
+from .etag import NOT_MODIFIED_CACHE_CONTROL, compute_etag, etag_matches
+
+# 响应体已是统一格式时由产生方设置的标记头，中间件见到后直接放行（不读取、不解析响应体）
+WRAPPED_HEADER = "x-response-wrapped"
+
+# 描述响应体的 headers，304 响应不应携带
+_BODY_HEADERS = (b"content-length", b"content-type", b"content-encoding")
 
 
 class ResponseWrapperMiddleware(BaseHTTPMiddleware):
@@ -17,58 +25,92 @@ class ResponseWrapperMiddleware(BaseHTTPMiddleware):
     """
 
     # 不需要包装的路径前缀（如 OpenAPI 文档）
-    EXCLUDE_PATHS = ["/docs", "/redoc", "/openapi.json"]
+    EXCLUDE_PATHS = ("/docs", "/redoc", "/openapi.json")
 
     async def dispatch(self, request: Request, call_next) -> Response:
-        # 跳过不需要包装的路径
-        if any(request.url.path.startswith(path) for path in self.EXCLUDE_PATHS):
+        # 跳过不需要包装的路径（startswith 直接接受前缀元组）
+        if request.url.path.startswith(self.EXCLUDE_PATHS):
             return await call_next(request)
 
         response = await call_next(request)
 
+        # 已包装的响应（如异常处理器返回的）：移除内部标记头后原样返回
+        if WRAPPED_HEADER in response.headers:
+            del response.headers[WRAPPED_HEADER]
+            return response
+
+        # 无响应体（204/304 或 content-length: 0）：没有可包装的内容
+        if (
+            response.status_code in (204, 304)
+            or response.headers.get("content-length") == "0"
+        ):
+            return response
+
         # 只处理 JSON 响应
         content_type = response.headers.get("content-type", "")
         if "application/json" not in content_type:
             return response
 
-        # 处理 StreamingResponse
-        if isinstance(response, StreamingResponse):
-            body_parts = []
-            async for chunk in response.body_iterator:
-                body_parts.append(chunk)
-            body = b"".join(body_parts)
-        else:
-            body = b""
-            async for chunk in response.body_iterator:
-                body += chunk
+        # call_next 返回的响应体总是流式的，统一用 bytearray 累积（避免 bytes += 的重复拷贝）
+        body = bytearray()
+        async for chunk in response.body_iterator:
+            body.extend(chunk)
 
-        # 解析原始响应
+        # 解析原始响应（orjson 直接接受 bytes/bytearray，省去 decode）
         try:
-            original_data = json.loads(body.decode())
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            return response
+            original_data = orjson.loads(body)
+            needs_wrap = not self._is_wrapped_response(original_data)
+        except orjson.JSONDecodeError:
+            needs_wrap = False
 
-        # 如果响应已经是统一格式，直接返回
-        if self._is_wrapped_response(original_data):
-            return Response(
-                content=body,
-                status_code=response.status_code,
-                headers=dict(response.headers),
-                media_type="application/json",
+        # 非法 JSON 或已经是统一格式：原样返回（body_iterator 已被读取，需用缓冲内容重建响应）
+        if not needs_wrap:
+            # 响应体未变，原 headers（含 content-length）可直接复用
+            new_response = Response(
+                content=bytes(body), status_code=response.status_code
             )
+            new_response.raw_headers = response.raw_headers
+        else:
+            # 包装响应
+            wrapped_data = {"code": 0, "message": "success", "data": original_data}
+            new_response = self._rebuild_response(response, orjson.dumps(wrapped_data))
 
-        # 包装响应
-        wrapped_data = {"code": 0, "message": "success", "data": original_data}
-
-        return JSONResponse(
-            content=wrapped_data,
-            status_code=response.status_code,
-            headers={
-                k: v
-                for k, v in response.headers.items()
-                if k.lower() != "content-length"
-            },
-        )
+        # 只读 GET 的成功响应附带 ETag，内容未变时返回 304，省去响应体传输
+        if request.method == "GET" and 200 <= new_response.status_code < 300:
+            return self._apply_etag(request, new_response)
+        return new_response
+
+    @staticmethod
+    def _apply_etag(request: Request, response: Response) -> Response:
+        """设置 ETag（路由已设置时直接沿用），命中 If-None-Match 时改为返回 304"""
+        headers = response.headers
+        etag = headers.get("etag")
+        if etag is None:
+            etag = compute_etag(response.body)
+            headers["etag"] = etag
+        if not etag_matches(request.headers.get("if-none-match"), etag):
+            return response
+
+        # 304 沿用原响应的 headers（ETag/CORS/缓存策略等），去掉描述响应体的字段
+        not_modified = Response(status_code=304)
+        not_modified.raw_headers = [
+            (k, v) for k, v in response.raw_headers if k not in _BODY_HEADERS
+        ]
+        if "cache-control" not in headers:
+            not_modified.headers["cache-control"] = NOT_MODIFIED_CACHE_CONTROL
+        return not_modified
+
+    @staticmethod
+    def _rebuild_response(response: Response, content: bytes) -> Response:
+        """用新的响应体重建响应：在原 raw headers 上原地修改（原响应随后丢弃）"""
+        new_response = Response(content=content, status_code=response.status_code)
+        headers = MutableHeaders(raw=response.raw_headers)
+        headers["content-length"] = str(len(content))
+        # 新响应体是未压缩的 JSON，原有的 content-encoding 不再适用
+        if "content-encoding" in headers:
+            del headers["content-encoding"]
+        new_response.raw_headers = headers.raw
+        return new_response
 
     def _is_wrapped_response(self, data: dict) -> bool:
         """检查响应是否已经是统一格式"""
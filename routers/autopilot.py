@@ -1,10 +1,13 @@
+import asyncio
+from datetime import datetime
 from typing import Union
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 
-from autopilot import get_job_service, TaskStatus, JobConfig
+from autopilot import get_job_service, Job, TaskResult, TaskStatus, JobConfig
 from autopilot.job import TaskInput
+from middleware import NOT_MODIFIED_CACHE_CONTROL, compute_etag, etag_matches
 
 router = APIRouter(prefix="/autopilot", tags=["autopilot"])
 
@@ -38,23 +41,13 @@ async def run_autopilot(request: AutopilotRunRequest):
     """
     service = get_job_service()
     try:
-        # 解析 tasks：支持字符串列表或 TaskInput 列表
-        tasks: list[str] | list[TaskInput] = []
-        for task in request.tasks:
-            if isinstance(task, str):
-                tasks.append(task)
-            elif isinstance(task, dict):
-                # 从字典构造 TaskInput
-                tasks.append(
-                    TaskInput(id=task.get("id", ""), text=task.get("text", ""))
-                )
-            elif isinstance(task, TaskInput):
-                tasks.append(task)
-            else:
-                raise ValueError(f"Invalid task format: {task}")
+        # Pydantic 已按 list[str] | list[TaskInput] 校验（dict 元素已转换为 TaskInput），
+        # 整个列表类型一致，无需逐个判断
+        tasks: list[str] | list[TaskInput] = request.tasks
 
-        config = JobConfig.model_validate(
-            request.model_dump(exclude={"tasks", "job_id", "callback_url"})
+        # AutopilotRunRequest 继承 JobConfig，这些字段在请求入口已校验，直接取值构造
+        config = JobConfig.model_construct(
+            **{name: getattr(request, name) for name in JobConfig.model_fields}
         )
         job = await service.create_job(
             tasks=tasks,
@@ -68,25 +61,63 @@ async def run_autopilot(request: AutopilotRunRequest):
     return {"job_id": job.id, "status": job.status}
 
 
-@router.get("/status/{job_id}")
-async def get_autopilot_status(job_id: str):
-    """获取指定 Job 的当前快照（包含状态与任务列表）"""
+def _json_response(body: bytes, headers: dict[str, str] | None = None) -> Response:
+    """直接返回已序列化的 JSON（跳过 FastAPI 的序列化，文档结构由 response_model 声明）"""
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/status/{job_id}", response_model=Job)
+async def get_autopilot_status(
+    job_id: str,
+    wait_etag: str | None = None,
+    timeout: float = Query(0, ge=0, le=60),
+) -> Response:
+    """
+    获取指定 Job 的当前快照（包含状态与任务列表）
+
+    长轮询：传入上次响应的 ETag 作为 wait_etag 时，若 Job 仍未变化，
+    最多等待 timeout 秒直到状态变化；期间无变化则返回 304。
+    """
     service = get_job_service()
     try:
-        return await service.get_job(job_id)
+        job = await service.get_job(job_id)
     except KeyError:
         raise HTTPException(status_code=404, detail="Job not found")
 
+    body = job.dump_json()
+    etag = compute_etag(body)
+    if wait_etag is not None and etag_matches(wait_etag, etag):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while etag_matches(wait_etag, etag):
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await job.wait_for_change(remaining):
+                # 与 ETag 中间件返回的 304 保持相同的缓存头
+                return Response(
+                    status_code=304,
+                    headers={
+                        "etag": etag,
+                        "cache-control": NOT_MODIFIED_CACHE_CONTROL,
+                    },
+                )
+            body = job.dump_json()
+            etag = compute_etag(body)
+
+    # 中间件沿用这里的 ETag，保证客户端拿到的 ETag 可直接作为下次的 wait_etag
+    return _json_response(body, headers={"etag": etag})
+
 
-@router.get("/jobs/{job_id}")
-async def get_autopilot_job(job_id: str):
+@router.get("/jobs/{job_id}", response_model=Job)
+async def get_autopilot_job(job_id: str) -> Response:
     """获取单个 Job（等价于 /status/{job_id}，仅用于更贴近 REST 命名）"""
-    return await get_autopilot_status(job_id)
+    return await get_autopilot_status(job_id, wait_etag=None, timeout=0)
 
 
 @router.get("/jobs/{job_id}/tasks")
-async def list_autopilot_job_tasks(job_id: str):
+async def list_autopilot_job_tasks(job_id: str) -> list[TaskResult]:
     """列出指定 Job 的任务列表（运行中也可查询）"""
+    # 声明返回类型：FastAPI 据此用 pydantic-core 直接序列化为 JSON bytes，
+    # 跳过 jsonable_encoder + 标准库 json.dumps
     service = get_job_service()
     try:
         return await service.get_job_tasks(job_id)
@@ -94,11 +125,33 @@ async def list_autopilot_job_tasks(job_id: str):
         raise HTTPException(status_code=404, detail="Job not found")
 
 
-@router.get("/jobs")
-async def list_autopilot_jobs(status: TaskStatus | None = None):
-    """列出所有 Job（可按状态筛选，默认按创建时间倒序）"""
+@router.get("/jobs", response_model=list[Job])
+async def list_autopilot_jobs(
+    request: Request,
+    status: TaskStatus | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    since: datetime | None = None,
+) -> Response:
+    """
+    列出 Job（可按状态筛选，按创建时间倒序）
+
+    分页：limit 为单页条数（默认 50，最大 500），offset 为跳过条数；
+    since 只返回该时间及之后创建的 Job。本页已满时通过 Link: rel="next" 给出下一页 URL。
+    """
     service = get_job_service()
-    return await service.list_jobs(status=status)
+    jobs = await service.list_jobs(
+        status=status, limit=limit, offset=offset, since=since
+    )
+    headers = None
+    if len(jobs) == limit:
+        # 本页已满，可能还有更多：其余查询参数保持不变，只推进 offset
+        next_url = request.url.include_query_params(offset=offset + limit)
+        headers = {"link": f'<{next_url}>; rel="next"'}
+    # 拼接各 Job 缓存的序列化结果，未变化的 Job 不再重复序列化
+    return _json_response(
+        b"[" + b",".join(job.dump_json() for job in jobs) + b"]", headers=headers
+    )
 
 
 class StopRequest(BaseModel):
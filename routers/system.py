@@ -1,20 +1,47 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from datetime import datetime, timezone
 import os
 import time
 
 from autopilot.app_meta import project_name, project_version
+from middleware import compute_etag
 
 router = APIRouter(prefix="/system", tags=["system"])
 
 _STARTED_AT = datetime.now(timezone.utc)
 _STARTED_MONO = time.monotonic()
 
+# 版本信息在进程内不变：响应体与 ETag 均在导入时构建一次，中间件沿用该 ETag 而不再对响应体哈希
+_VERSION_PAYLOAD = {
+    "name": project_name(),
+    "version": project_version(),
+    "api_version": "v1",
+}
+_VERSION_ETAG = compute_etag("/".join(_VERSION_PAYLOAD.values()).encode())
+
+# 缓存策略：版本信息允许客户端缓存并在后台重新校验；健康检查含时间戳，只短暂缓存
+_VERSION_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=60"
+_HEALTH_CACHE_CONTROL = "public, max-age=5"
+
+
+# 健康检查时间戳按秒缓存：同一秒内的探测请求复用同一个字符串
+_ts_cache: tuple[int, str] = (0, "")
+
+
+def _utc_iso_cached() -> str:
+    """返回当前 UTC 时间的 ISO 字符串（秒级精度）"""
+    global _ts_cache
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache = (now, datetime.fromtimestamp(now, timezone.utc).isoformat())
+    return _ts_cache[1]
+
 
 @router.get("/health")
-async def health_check():
+async def health_check(response: Response):
     """健康检查接口"""
-    return {"status": "healthy", "timestamp": datetime.now(timezone.utc).isoformat()}
+    response.headers["cache-control"] = _HEALTH_CACHE_CONTROL
+    return {"status": "healthy", "timestamp": _utc_iso_cached()}
 
 
 @router.get("/connect")
@@ -35,10 +62,8 @@ async def connect_check():
 
 
 @router.get("/version")
-async def get_version():
+async def get_version(response: Response):
     """获取系统版本信息"""
-    return {
-        "name": project_name(),
-        "version": project_version(),
-        "api_version": "v1",
-    }
+    response.headers["etag"] = _VERSION_ETAG
+    response.headers["cache-control"] = _VERSION_CACHE_CONTROL
+    return _VERSION_PAYLOAD
@@ -4,26 +4,39 @@ import sys
 from pathlib import Path
 
 
-def _find_repo_root(start: Path) -> Path:
-    current = start
-    while current != current.parent:
-        if (current / "pyproject.toml").exists() or (current / ".git").exists():
-            return current
-        current = current.parent
-    return start
-
-
-_REPO_ROOT = _find_repo_root(Path(__file__).resolve())
+# 脚本固定位于 <repo>/scripts/help/ 下，直接取上两级目录，无需逐级查找
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+assert (_REPO_ROOT / "pyproject.toml").exists(), f"repo root not found: {_REPO_ROOT}"
 if str(_REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(_REPO_ROOT))
 
 from autopilot import Job, JobConfig
+from autopilot.browser_pool import close_browser_pool
+from autopilot.callback import close_shared_client
 
 
-async def main(tasks: list[str], headless: bool = False):
+async def _read_tasks(task_paths: list[Path]) -> list[str]:
+    """并发读取任务文件（每个文件在线程中读取，I/O 相互重叠），结果保持输入顺序"""
+    # read_bytes 后整体 decode 一次，省去 TextIOWrapper 的缓冲与增量解码；
+    # 换行统一为 \n，与 read_text 的通用换行模式一致
+    contents = await asyncio.gather(
+        *(asyncio.to_thread(path.read_bytes) for path in task_paths)
+    )
+    return [
+        content.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+        for content in contents
+    ]
+
+
+async def main(task_paths: list[Path], headless: bool = False):
+    tasks = await _read_tasks(task_paths)
     config = JobConfig(headless=headless)
     job = Job.create(tasks=tasks, config=config)
-    await job.run()
+    try:
+        await job.run()
+    finally:
+        await close_shared_client()
+        await close_browser_pool()
 
     # 打印执行结果
     print(f"\nJob ID: {job.id}")
@@ -57,7 +70,6 @@ if __name__ == "__main__":
         parser.error("必须指定 --path 或 --directory 之一")
 
     # 支持多个任务文件
-    tasks = []
     if args.path:
         task_paths = [Path(path) for path in args.path]
     else:
@@ -68,8 +80,10 @@ if __name__ == "__main__":
         if not task_paths:
             raise FileNotFoundError(f"未找到任务文件：{task_dir}/*.txt")
 
-    for path in task_paths:
-        task_content = path.read_text(encoding="utf-8")
-        tasks.append(task_content)
-
-    asyncio.run(main(tasks, args.headless))
+    # 与 uvicorn（loop="auto"）保持一致：安装了 uvloop（uvicorn[standard] 依赖）则优先使用
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main(task_paths, args.headless))
+    else:
+        uvloop.run(main(task_paths, args.headless))
@@ -1,15 +1,19 @@
+import errno
 import logging
 import os
+import re
 import shutil
+import sys
+from functools import lru_cache
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
 
-def is_system_chrome_user_data_dir(user_data_dir: Path) -> bool:
-    s = str(user_data_dir).lower()
-    return any(
-        token in s
+# 系统 Chrome user_data_dir 的路径特征，预编译为单个正则，一次扫描完成匹配
+_SYSTEM_CHROME_RE = re.compile(
+    "|".join(
+        re.escape(token)
         for token in (
             "library/application support/google/chrome",  # macOS
             "appdata/local/google/chrome/user data",  # Windows
@@ -17,6 +21,11 @@ def is_system_chrome_user_data_dir(user_data_dir: Path) -> bool:
             ".config/google-chrome",  # Linux
         )
     )
+)
+
+
+def is_system_chrome_user_data_dir(user_data_dir: Path) -> bool:
+    return _SYSTEM_CHROME_RE.search(str(user_data_dir).lower()) is not None
 
 
 _SESSION_RESTORE_NAMES = frozenset({
@@ -33,6 +42,46 @@ def _ignore_session_files(_dir: str, entries: list[str]) -> set[str]:
     return _SESSION_RESTORE_NAMES & set(entries)
 
 
+# linux/fs.h: FICLONE = _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+# 文件系统/内核不支持 reflink 时 ioctl 返回的错误码
+_CLONE_UNSUPPORTED_ERRNOS = frozenset(
+    {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.ENOSYS}
+)
+
+
+def _fast_copytree(src: Path, dst: Path, **kwargs) -> None:
+    """
+    copytree 的快速版本：Linux 上优先用 FICLONE 做 reflink（只复制元数据，不复制数据块）。
+
+    btrfs/XFS 等支持 reflink 的文件系统上，profile 复制从 O(字节数) 变为近似 O(文件数)；
+    首次遇到不支持的情况后，本次复制余下文件直接回退 shutil.copy2。
+    """
+    if sys.platform != "linux":
+        shutil.copytree(src, dst, **kwargs)
+        return
+
+    import fcntl
+
+    clone_supported = True
+
+    def clone_or_copy2(src_file: str, dst_file: str) -> str:
+        nonlocal clone_supported
+        if clone_supported:
+            try:
+                with open(src_file, "rb") as fsrc, open(dst_file, "wb") as fdst:
+                    fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            except OSError as e:
+                if e.errno in _CLONE_UNSUPPORTED_ERRNOS:
+                    clone_supported = False
+            else:
+                shutil.copystat(src_file, dst_file)
+                return dst_file
+        return shutil.copy2(src_file, dst_file)
+
+    shutil.copytree(src, dst, copy_function=clone_or_copy2, **kwargs)
+
+
 def seed_persistent_profile_if_needed(
     *,
     src_user_data_dir: Path,
@@ -45,6 +94,8 @@ def seed_persistent_profile_if_needed(
 
     背景：browser-use>=0.11.9 会把传入的 Chrome user_data_dir 复制到临时目录运行，
     以避免系统 profile 锁冲突/损坏；但这会导致登录态无法持久化。
+
+    复制可能涉及数百 MB 的同步 I/O，异步代码中请放到线程里调用。
     """
     log = log or logger
     dst_profile_dir = dst_user_data_dir / profile_directory
@@ -57,7 +108,7 @@ def seed_persistent_profile_if_needed(
 
     try:
         if src_profile_dir.exists():
-            shutil.copytree(
+            _fast_copytree(
                 src_profile_dir,
                 dst_profile_dir,
                 dirs_exist_ok=True,
@@ -80,6 +131,8 @@ def seed_persistent_profile_if_needed(
     return True
 
 
+# 入参在进程内是常量，结果缓存以免每次启动浏览器都重复 stat/种子检查
+@lru_cache(maxsize=8)
 def resolve_chrome_user_data_dir(
     *,
     chrome_executable_path: str | None,